@@ -1,21 +1,46 @@
 import click
+import csv
 import json
+import os
 from pathlib import Path
 from echoswift.llm_inference_benchmark import EchoSwift
 from echoswift.dataset import download_dataset_files
-from echoswift.utils.plot_results import plot_benchmark_results 
 import logging
 from tabulate import tabulate
-import pandas as pd
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
+RESULT_COLUMNS = ['output tokens', 'throughput(tokens/second)', 'latency(ms)', 'TTFT(ms)', 'latency_per_token(ms/token)']
+
 def load_config(config_file):
     with open(config_file, 'r') as f:
         return json.load(f)
 
+def _write_config(path, cfg):
+    # Write to a sibling temp file and swap it in, so an interrupted write
+    # never leaves a truncated config behind.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cfg, f, indent=2)
+    os.replace(tmp_path, path)
+
+def read_avg_results(avg_file):
+    with open(avg_file, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+def _round_metric(value):
+    return round(float(value), 3) if value else None
+
+def _parse_backends(ctx, param, value):
+    if value is None:
+        return None
+    backends = [backend.strip() for backend in value.split(',') if backend.strip()]
+    if not backends:
+        raise click.BadParameter("expected at least one backend URL")
+    return backends
+
 @click.group(context_settings=CONTEXT_SETTINGS)
 def cli():
     """
@@ -49,8 +74,7 @@ def create_config(output='config.json'):
     if output_path.exists():
         click.confirm(f"The file {output} already exists. Do you want to overwrite it?", abort=True)
 
-    with open(output_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    _write_config(output_path, config)
 
     click.echo(f"Configuration file created: {output_path}")
     click.echo("Please review and modify this file before running the benchmark.")
@@ -72,7 +96,13 @@ def dataprep(config):
 
 @cli.command()
 @click.option('--config', required=True, type=click.Path(exists=True), help='Path to the configuration file')
-def start(config):
+@click.option('--plateau-threshold', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Stop early once total throughput grows by less than this fraction (e.g. 0.02) '
+                   'for two consecutive user counts')
+@click.option('--backends', default=None, callback=_parse_backends,
+              help='Comma-separated URLs of equivalent inference server replicas to use instead of base_url; '
+                   'with more than one, user counts are benchmarked concurrently across them')
+def start(config, plateau_threshold, backends):
     """Start the EchoSwift benchmark using the specified config file"""
     config_path = Path(config)
     cfg = load_config(config_path)
@@ -96,7 +126,9 @@ def start(config):
             user_counts=cfg['user_counts'],
             input_tokens=cfg['input_tokens'],
             output_tokens=cfg['output_tokens'],
-            dataset_dir=str(dataset_dir)
+            dataset_dir=str(dataset_dir),
+            plateau_threshold=plateau_threshold,
+            backends=backends
         )
         
         benchmark.run_benchmark()
@@ -108,20 +140,15 @@ def start(config):
             for input_token in cfg['input_tokens']:
                 avg_file = user_dir / f"avg_{input_token}_input_tokens.csv"
                 if avg_file.exists():
-                    df = pd.read_csv(avg_file)
-                    df['Users'] = u
-                    df['Input Tokens'] = input_token
-                    all_results.append(df)
+                    for row in read_avg_results(avg_file):
+                        all_results.append([u, input_token, int(row['output tokens'])] +
+                                           [_round_metric(row[column]) for column in RESULT_COLUMNS[1:]])
 
         if all_results:
-            combined_df = pd.concat(all_results, ignore_index=True)
-            combined_df = combined_df[['Users', 'Input Tokens', 'output tokens', 'throughput(tokens/second)', 'latency(ms)', 'TTFT(ms)', 'latency_per_token(ms/token)']]
-            combined_df = combined_df.round(3)
-            
-            # Sort the DataFrame
-            combined_df = combined_df.sort_values(['Users', 'Input Tokens', 'output tokens'])
+            # Sort by Users, Input Tokens, output tokens
+            all_results.sort(key=lambda result: result[:3])
 
-            click.echo(tabulate(combined_df, headers='keys', tablefmt='pretty', showindex=False))
+            click.echo(tabulate(all_results, headers=['Users', 'Input Tokens'] + RESULT_COLUMNS, tablefmt='pretty'))
 
             click.echo("Tests completed successfully !!")
                         
@@ -139,6 +166,9 @@ def plot(results_dir):
     if not results_path.is_dir():
         raise click.BadParameter("The specified results directory is not a directory.")
     
+    # Imported here so other commands don't pay for loading pandas and matplotlib
+    from echoswift.utils.plot_results import plot_benchmark_results
+
     try:
         plot_benchmark_results(results_path)
         click.echo(f"Plots have been generated and saved in {results_path}")
@@ -1,11 +1,14 @@
 import os
+import csv
 import subprocess
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from tqdm import tqdm
 import signal
+import queue
 import pkg_resources
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -13,9 +16,11 @@ class EchoSwift:
     def __init__(self, output_dir: str, api_url: str, inference_server: str, model_name: str = None,
                  max_requests: int = 5, user_counts: List[int] = [1],
                  input_tokens: List[int] = [32], output_tokens: List[int] = [256],
-                 dataset_dir: str = "Input_Dataset"):
+                 dataset_dir: str = "Input_Dataset", plateau_threshold: Optional[float] = None,
+                 backends: Optional[List[str]] = None):
         self.output_dir = Path(output_dir)
-        self.api_url = api_url
+        self.backends = backends or [api_url]
+        self.api_url = self.backends[0]
         self.inference_server = inference_server
         self.model_name = model_name
         self.max_requests = max_requests
@@ -23,6 +28,7 @@ class EchoSwift:
         self.input_tokens = input_tokens
         self.output_tokens = output_tokens
         self.dataset_dir = Path(dataset_dir)
+        self.plateau_threshold = plateau_threshold
 
     def run_benchmark(self):
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -30,8 +36,20 @@ class EchoSwift:
         locust_logs_dir.mkdir(exist_ok=True)
         
         total_requests = sum(self.user_counts) * self.max_requests * len(self.input_tokens) * len(self.output_tokens)
-        logging.info(f"Total requests to be sent: {total_requests}")
-
+        if self.plateau_threshold is not None:
+            logging.info(f"Total requests to be sent: up to {total_requests} (the sweep may stop early once throughput plateaus)")
+        else:
+            logging.info(f"Total requests to be sent: {total_requests}")
+
+        if len(self.backends) > 1:
+            self._run_on_backends(locust_logs_dir)
+            return
+
+        # Averaging for one (user count, input tokens) pair runs in the background
+        # while Locust benchmarks the next pair
+        pending_average = None
+        previous_throughput = None
+        plateau_steps = 0
         for u in self.user_counts:
             user_dir = self.output_dir / f"{u}_User"
             user_dir.mkdir(exist_ok=True)
@@ -41,18 +59,94 @@ class EchoSwift:
                 user_file.touch()
 
                 for output_token in self.output_tokens:
+                    # Abort before another Locust run if the in-flight averaging already failed
+                    if pending_average is not None and pending_average.poll() not in (None, 0):
+                        self._wait_for_average(pending_average)
                     logging.info(f"Running Locust with users={u}, input_tokens={input_token}, and output_tokens={output_token}")
-                    self._run_locust(u, input_token, output_token, user_file, locust_logs_dir)
+                    self._run_locust(u, input_token, output_token, user_file, locust_logs_dir, self.api_url)
+
+                if pending_average is not None:
+                    self._wait_for_average(pending_average)
+                pending_average = self._calculate_average(user_dir, input_token)
+
+            if self.plateau_threshold is not None:
+                # The plateau check needs this user count's averages right away
+                if pending_average is not None:
+                    self._wait_for_average(pending_average)
+                    pending_average = None
+
+                total_throughput = self._total_throughput(user_dir, u)
+                if previous_throughput and total_throughput is not None:
+                    gain = (total_throughput - previous_throughput) / previous_throughput
+                    plateau_steps = plateau_steps + 1 if gain < self.plateau_threshold else 0
+                    if plateau_steps >= 2:
+                        logging.info(f"Total throughput plateaued at {u} users ({total_throughput:.3f} tokens/second). "
+                                     f"Skipping the remaining user counts.")
+                        break
+                previous_throughput = total_throughput
+
+        if pending_average is not None:
+            self._wait_for_average(pending_average)
+
+    def _run_on_backends(self, locust_logs_dir: Path):
+        # Each user count is benchmarked against whichever backend replica is free,
+        # so independent user counts run concurrently
+        if self.plateau_threshold is not None:
+            logging.warning("--plateau-threshold is ignored when running against multiple backends.")
+
+        # Each backend gets its own progress bar row so concurrent runs don't overwrite each other
+        free_backends = queue.Queue()
+        for position, backend in enumerate(self.backends):
+            free_backends.put((position, backend))
+
+        def run_user_count(u: int):
+            position, api_url = free_backends.get()
+            try:
+                user_dir = self.output_dir / f"{u}_User"
+                user_dir.mkdir(exist_ok=True)
+
+                for input_token in self.input_tokens:
+                    user_file = user_dir / f"{input_token}_input_tokens.csv"
+                    user_file.touch()
 
-                self._calculate_average(user_dir, input_token)
+                    for output_token in self.output_tokens:
+                        logging.info(f"Running Locust with users={u}, input_tokens={input_token}, and output_tokens={output_token} against {api_url}")
+                        self._run_locust(u, input_token, output_token, user_file, locust_logs_dir, api_url, position)
 
-    def _run_locust(self, users: int, input_tokens: int, output_tokens: int, output_file: Path, logs_dir: Path):
+                    self._wait_for_average(self._calculate_average(user_dir, input_token))
+            finally:
+                free_backends.put((position, api_url))
+
+        with ThreadPoolExecutor(max_workers=len(self.backends)) as executor:
+            futures = [executor.submit(run_user_count, u) for u in self.user_counts]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Don't start queued user counts after a failure or Ctrl-C
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    def _total_throughput(self, user_dir: Path, users: int) -> Optional[float]:
+        throughputs = []
+        for input_token in self.input_tokens:
+            avg_file = user_dir / f"avg_{input_token}_input_tokens.csv"
+            if avg_file.exists():
+                with open(avg_file, 'r', newline='') as f:
+                    throughputs.extend(float(row['throughput(tokens/second)'])
+                                       for row in csv.DictReader(f) if row['throughput(tokens/second)'])
+        if not throughputs:
+            return None
+        return users * sum(throughputs) / len(throughputs)
+
+    def _run_locust(self, users: int, input_tokens: int, output_tokens: int, output_file: Path, logs_dir: Path,
+                    api_url: str, progress_position: Optional[int] = None):
         env = os.environ.copy()
         env.update({
             "MAX_REQUESTS": str(self.max_requests),
             "NUM_USERS": str(users),
             "MAX_NEW_TOKENS": str(output_tokens),
-            "API_URL": self.api_url,
+            "API_URL": api_url,
             "INFERENCE_SERVER": self.inference_server,
             "INPUT_DATASET": str(self.dataset_dir / f"Dataset_{input_tokens}.csv"),
             "OUTPUT_FILE": str(output_file)
@@ -66,7 +160,7 @@ class EchoSwift:
             "locust",
             "-f", locust_file,
             "--headless",
-            "-H", self.api_url,
+            "-H", api_url,
             "-u", str(users),
             "-r", str(users)
         ]
@@ -74,7 +168,8 @@ class EchoSwift:
         log_file_path = logs_dir / f"locust_log_u{users}_in{input_tokens}_out{output_tokens}.log"
         
         total_requests = users * self.max_requests
-        with tqdm(total=total_requests, desc=f"Requests (u={users}, in={input_tokens}, out={output_tokens})", leave=True) as pbar, \
+        with tqdm(total=total_requests, desc=f"Requests (u={users}, in={input_tokens}, out={output_tokens})",
+                  position=progress_position, leave=progress_position is None) as pbar, \
              open(log_file_path, 'w') as log_file:
             process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
             
@@ -106,7 +201,7 @@ class EchoSwift:
         if process.returncode != 0 and process.returncode != -signal.SIGTERM.value:
             logging.error(f"Locust command failed with return code {process.returncode}. Check the log file: {log_file_path}")
 
-    def _calculate_average(self, user_dir: Path, input_token: int):
+    def _calculate_average(self, user_dir: Path, input_token: int) -> subprocess.Popen:
         input_file = user_dir / f"{input_token}_input_tokens.csv"
         output_file = user_dir / f"avg_{input_token}_input_tokens.csv"
         
@@ -119,11 +214,13 @@ class EchoSwift:
             "--tokens"
         ] + [str(t) for t in self.output_tokens]
 
-        try:
-            subprocess.run(command, check=True)
-        except subprocess.CalledProcessError as e:
+        return subprocess.Popen(command)
+
+    def _wait_for_average(self, process: subprocess.Popen):
+        if process.wait() != 0:
+            e = subprocess.CalledProcessError(process.returncode, process.args)
             logging.error(f"Error calculating average: {e}")
-            raise
+            raise e
 
 def run_echoswift(output_dir: str, api_url: str, inference_server: str, model_name: str = None,
                   max_requests: int = 5, user_counts: List[int] = [1],
@@ -9,6 +9,14 @@ from transformers import AutoTokenizer
 from threading import Barrier, BrokenBarrierError
 import json
 
+# Streamed chunks are parsed while the request is being timed, so prefer the
+# faster orjson parser when it is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
@@ -19,6 +27,28 @@ tokenizer = AutoTokenizer.from_pretrained("hf-internal-testing/llama-tokenizer")
 num_users = int(os.environ.get("NUM_USERS", 10))
 barrier = Barrier(num_users)
 
+RESULT_FIELDNAMES = [
+    'request', 'start_time', 'end_time', 'input_tokens',
+    'output_tokens', 'latency(ms)', 'throughput(tokens/second)',
+    'latency_per_token(ms/token)', 'TTFT(ms)'
+]
+
+# Results file shared by all users in this process, opened on first write
+_results_file = None
+_results_writer = None
+
+def get_results_writer(output_file_path):
+    """
+    Return the shared CSV writer for the results file, writing the header once.
+    """
+    global _results_file, _results_writer
+    if _results_writer is None:
+        _results_file = open(output_file_path, 'a', newline='')
+        _results_writer = csv.DictWriter(_results_file, fieldnames=RESULT_FIELDNAMES)
+        if _results_file.tell() == 0:
+            _results_writer.writeheader()
+    return _results_writer
+
 class APITestUser(HttpUser):
     """
     Represents a Locust user for load testing an API.
@@ -38,6 +68,14 @@ class APITestUser(HttpUser):
         self.output_file_path = os.environ.get('OUTPUT_FILE', 'output.csv')
         self.inference_server = os.environ.get('INFERENCE_SERVER', " ")
         self.model_name = os.environ.get('MODEL_NAME', " ")
+        # Resolve the response handler once rather than on every request
+        self.response_handler = {
+            "TGI": self._process_tgi_response,
+            "Ollama": self._process_ollama_response,
+            "Llamacpp": self._process_llamacpp_response,
+            "vLLM": self._process_vLLM_response,
+            "NIMS": self._process_NIMS_response,
+        }.get(self.inference_server)
 
     @staticmethod
     def load_dataset(csv_file):
@@ -103,17 +141,8 @@ class APITestUser(HttpUser):
         """
         generated_text = ""
         ttft = None
-        inference_server_handlers = {
-            "TGI": self._process_tgi_response,
-            "Ollama": self._process_ollama_response,
-            "Llamacpp": self._process_llamacpp_response,
-            "vLLM":self._process_vLLM_response,
-            "NIMS":self._process_NIMS_response,
-        }
-
-        handler = inference_server_handlers.get(self.inference_server, None)
-        if handler:
-            generated_text, ttft = handler(response)
+        if self.response_handler:
+            generated_text, ttft = self.response_handler(response)
 
         output_tokens = len(tokenizer.encode(generated_text))
         return generated_text, output_tokens, ttft
@@ -134,7 +163,7 @@ class APITestUser(HttpUser):
             if "data:" in decoded_chunk:
                 try:
                     json_data = decoded_chunk.split("data:")[1]
-                    json_data = json.loads(json_data)
+                    json_data = json_loads(json_data)
                     token = json_data["token"]["text"]
                     generated_text += token
                 except (json.JSONDecodeError, KeyError):
@@ -157,7 +186,7 @@ class APITestUser(HttpUser):
             decoded_chunk = chunk.decode('utf-8')
             if decoded_chunk:
                 try:
-                    json_data = json.loads(decoded_chunk)
+                    json_data = json_loads(decoded_chunk)
                     token = json_data["response"]
                     generated_text += token
                 except (json.JSONDecodeError, KeyError):
@@ -180,7 +209,7 @@ class APITestUser(HttpUser):
             if "data:" in decoded_chunk:
                 try:
                     json_data = decoded_chunk.split("data:")[1]
-                    json_data = json.loads(json_data)
+                    json_data = json_loads(json_data)
                     token = json_data["content"]
                     generated_text += token
                 except (json.JSONDecodeError, KeyError):
@@ -205,7 +234,7 @@ class APITestUser(HttpUser):
             if "data:" in decoded_chunk:
                 try:
                     json_data = decoded_chunk.split("data:")[1]
-                    json_data = json.loads(json_data)
+                    json_data = json_loads(json_data)
                     token = json_data["choices"][0]["text"]
                     generated_text += token
                 except (json.JSONDecodeError, KeyError) as e:
@@ -232,7 +261,7 @@ class APITestUser(HttpUser):
             if "data:" in decoded_chunk and i!=0:
                 try:
                     json_data = decoded_chunk.split("data:")[1]
-                    json_data = json.loads(json_data)
+                    json_data = json_loads(json_data)
                     token = json_data["choices"][0]["delta"]["content"]
                     generated_text += token
                 except (json.JSONDecodeError, KeyError):
@@ -293,28 +322,20 @@ class APITestUser(HttpUser):
         """
         Log the results to the output CSV file.
         """
-        with open(self.output_file_path, 'a', newline='') as csvfile:
-            fieldnames = [
-                'request', 'start_time', 'end_time', 'input_tokens',
-                'output_tokens', 'latency(ms)', 'throughput(tokens/second)',
-                'latency_per_token(ms/token)', 'TTFT(ms)'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            if csvfile.tell() == 0:
-                writer.writeheader()
-
-            writer.writerow({
-                'request': self.request_count,
-                'start_time': start_time,
-                'end_time': end_time,
-                'input_tokens': input_tokens,
-                'output_tokens': output_tokens,
-                'latency(ms)': f"{latency * 1000:.3f}",
-                'throughput(tokens/second)': f"{throughput:.3f}",
-                'latency_per_token(ms/token)': f"{latency_per_token:.3f}",
-                'TTFT(ms)': f"{ttft * 1000:.3f}"
-            })
+        writer = get_results_writer(self.output_file_path)
+        writer.writerow({
+            'request': self.request_count,
+            'start_time': start_time,
+            'end_time': end_time,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'latency(ms)': f"{latency * 1000:.3f}",
+            'throughput(tokens/second)': f"{throughput:.3f}",
+            'latency_per_token(ms/token)': f"{latency_per_token:.3f}",
+            'TTFT(ms)': f"{ttft * 1000:.3f}"
+        })
+        # Flush per row so results survive the parent terminating Locust
+        _results_file.flush()
 
     def on_stop(self):
         """
@@ -2,6 +2,16 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
+from typing import NamedTuple
+
+AGGREGATED_COLUMNS = ['Number of Parallel Requests', 'Output Token', 'Token Latency (ms/token)',
+                      'Throughput (tokens/second)', 'TTFT (ms)']
+
+class BenchmarkPoint(NamedTuple):
+    output_token: float
+    token_latency: float
+    throughput: float
+    ttft: float
 
 def process_csv_files(directory_path):
     user_number = int(''.join(filter(str.isdigit, directory_path.name)))
@@ -13,20 +23,21 @@ def process_csv_files(directory_path):
     for csv_file in csv_files:
         df = pd.read_csv(csv_file)
         for _, row in df.iterrows():
-            output_token = row['output tokens']
-            token_latency = row['latency_per_token(ms/token)']
-            throughput = row['throughput(tokens/second)']
-            ttft = row['TTFT(ms)']
-            data.setdefault(user_number, []).append((output_token, token_latency, throughput, ttft))
+            data.setdefault(user_number, []).append(BenchmarkPoint(
+                output_token=row['output tokens'],
+                token_latency=row['latency_per_token(ms/token)'],
+                throughput=row['throughput(tokens/second)'],
+                ttft=row['TTFT(ms)']
+            ))
 
     return data
 
 def write_to_csv(data, output_file):
     with open(output_file, 'w') as f:
-        f.write('Number of Parallel Requests,Output Token,Token Latency (ms/token),Throughput (tokens/second),TTFT (ms)\n')
+        f.write(','.join(AGGREGATED_COLUMNS) + '\n')
         for num_Requests, values in sorted(data.items()):
             for value in values:
-                f.write(f'{num_Requests},{value[0]},{value[1]},{value[2]},{value[3]}\n')
+                f.write(f'{num_Requests},{value.output_token},{value.token_latency},{value.throughput},{value.ttft}\n')
 
 def plot_line_chart(data, x_label, y_label, title, output_file):
     plt.figure(figsize=(10, 6))
@@ -68,7 +79,11 @@ def plot_benchmark_results(base_directory):
     write_to_csv(data, output_file)
     print(f"Aggregated data has been written to {output_file}")
 
-    df = pd.read_csv(output_file)
+    # Build the frame from the in-memory data rather than re-parsing the CSV just written
+    df = pd.DataFrame(
+        [(num_Requests, *value) for num_Requests, values in sorted(data.items()) for value in values],
+        columns=AGGREGATED_COLUMNS
+    )
 
     plot_line_chart(df[['Number of Parallel Requests', 'Token Latency (ms/token)']], 
                     'Number of Parallel Requests', 'Token Latency (ms/token)', 
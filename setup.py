@@ -19,7 +19,6 @@ setup(
     },
     install_requires=[
         "click",
-        "pyyaml",
         "tqdm",
         "pandas",
         "matplotlib",
@@ -3,7 +3,6 @@ from click.testing import CliRunner
 from echoswift.cli import cli
 import json
 from unittest.mock import patch, Mock
-import pandas as pd
 from pathlib import Path
 
 @pytest.fixture
@@ -27,6 +26,26 @@ def mock_config_file(tmp_path):
         json.dump(config, f)
     return str(config_file)
 
+@pytest.fixture
+def mock_start():
+    with patch('echoswift.cli.Path') as mock_path, \
+         patch('echoswift.cli.EchoSwift') as mock_echoswift, \
+         patch('echoswift.cli.load_config') as mock_load_config, \
+         patch('echoswift.cli.read_avg_results', return_value=[]):
+        mock_load_config.return_value = {
+            "out_dir": "test_results",
+            "base_url": "http://localhost:8000/v1/completions",
+            "inference_server": "vLLM",
+            "model": "meta-llama/Meta-Llama-3-8B",
+            "max_requests": 5,
+            "user_counts": [3, 6],
+            "input_tokens": [32],
+            "output_tokens": [256]
+        }
+        mock_path.return_value.exists.return_value = True
+        mock_path.return_value.iterdir.return_value = [Mock()]
+        yield mock_echoswift
+
 def test_cli_help(runner):
     result = runner.invoke(cli, ['--help'])
     assert result.exit_code == 0
@@ -63,10 +82,9 @@ def test_start_command_without_config(runner):
 @patch('echoswift.cli.Path')
 @patch('echoswift.cli.EchoSwift')
 @patch('echoswift.cli.load_config')
-@patch('echoswift.cli.pd.read_csv')
-@patch('echoswift.cli.pd.concat')
+@patch('echoswift.cli.read_avg_results')
 @patch('echoswift.cli.tabulate')
-def test_start_command_with_config(mock_tabulate, mock_concat, mock_read_csv, mock_load_config, mock_echoswift, mock_path, runner, mock_config_file):
+def test_start_command_with_config(mock_tabulate, mock_read_avg_results, mock_load_config, mock_echoswift, mock_path, runner, mock_config_file):
     mock_config = {
         "out_dir": "test_results",
         "base_url": "http://localhost:8000/v1/completions",
@@ -84,17 +102,13 @@ def test_start_command_with_config(mock_tabulate, mock_concat, mock_read_csv, mo
     
     mock_benchmark_instance = mock_echoswift.return_value
 
-    mock_df = pd.DataFrame({
-        'Users': [3],
-        'Input Tokens': [32],
-        'output tokens': [256],
-        'throughput(tokens/second)': [100],
-        'latency(ms)': [50],
-        'TTFT(ms)': [10],
-        'latency_per_token(ms/token)': [0.2]
-    })
-    mock_read_csv.return_value = mock_df
-    mock_concat.return_value = mock_df
+    mock_read_avg_results.return_value = [{
+        'output tokens': '256',
+        'throughput(tokens/second)': '100',
+        'latency(ms)': '50',
+        'TTFT(ms)': '10',
+        'latency_per_token(ms/token)': '0.2'
+    }]
 
     with runner.isolated_filesystem():
         result = runner.invoke(cli, ['start', '--config', mock_config_file])
@@ -109,12 +123,28 @@ def test_start_command_with_config(mock_tabulate, mock_concat, mock_read_csv, mo
         user_counts=mock_config['user_counts'],
         input_tokens=mock_config['input_tokens'],
         output_tokens=mock_config['output_tokens'],
-        dataset_dir=str(mock_path.return_value)
+        dataset_dir=str(mock_path.return_value),
+        plateau_threshold=None,
+        backends=None
     )
     mock_benchmark_instance.run_benchmark.assert_called_once()
-    mock_read_csv.assert_called()
-    mock_concat.assert_called()
-    mock_tabulate.assert_called()
+    mock_read_avg_results.assert_called()
+    mock_tabulate.assert_called_once()
+    assert mock_tabulate.call_args[0][0] == [[3, 32, 256, 100.0, 50.0, 10.0, 0.2]]
+
+def test_start_command_with_plateau_threshold(runner, mock_config_file, mock_start):
+    result = runner.invoke(cli, ['start', '--config', mock_config_file, '--plateau-threshold', '0.02'])
+
+    assert result.exit_code == 0, f"Command failed with error: {result.output}"
+    assert mock_start.call_args.kwargs['plateau_threshold'] == 0.02
+
+@pytest.mark.parametrize('threshold', ['0', '-0.5'])
+def test_start_command_rejects_non_positive_plateau_threshold(runner, mock_config_file, mock_start, threshold):
+    result = runner.invoke(cli, ['start', '--config', mock_config_file, '--plateau-threshold', threshold])
+
+    assert result.exit_code != 0
+    assert "Invalid value for '--plateau-threshold'" in result.output
+    mock_start.assert_not_called()
 
 @patch('echoswift.cli.Path')
 @patch('echoswift.cli.load_config')
@@ -143,7 +173,7 @@ def test_plot_command_without_results_dir(runner):
     assert result.exit_code != 0
     assert 'Error: Missing option \'--results-dir\'' in result.output
 
-@patch('echoswift.cli.plot_benchmark_results')
+@patch('echoswift.utils.plot_results.plot_benchmark_results')
 def test_plot_command_with_results_dir(mock_plot, runner, tmp_path):
     results_dir = tmp_path / "test_results"
     results_dir.mkdir()
@@ -157,4 +187,19 @@ def test_plot_command_with_results_dir(mock_plot, runner, tmp_path):
 def test_plot_command_with_invalid_results_dir(runner):
     result = runner.invoke(cli, ['plot', '--results-dir', '/non/existent/path'])
     assert result.exit_code != 0
-    assert 'Error: Invalid value for \'--results-dir\'' in result.output
\ No newline at end of file
+    assert 'Error: Invalid value for \'--results-dir\'' in result.output
+
+def test_start_command_with_backends(runner, mock_config_file, mock_start):
+    result = runner.invoke(cli, ['start', '--config', mock_config_file, '--backends',
+                                 'http://host-a:8000/v1/completions, http://host-b:8000/v1/completions,'])
+
+    assert result.exit_code == 0, f"Command failed with error: {result.output}"
+    assert mock_start.call_args.kwargs['backends'] == ['http://host-a:8000/v1/completions',
+                                                       'http://host-b:8000/v1/completions']
+
+def test_start_command_rejects_empty_backends(runner, mock_config_file, mock_start):
+    result = runner.invoke(cli, ['start', '--config', mock_config_file, '--backends', ' , '])
+
+    assert result.exit_code != 0
+    assert "Invalid value for '--backends'" in result.output
+    mock_start.assert_not_called()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import subprocess
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+from echoswift.llm_inference_benchmark import EchoSwift
+
+def make_process(returncode):
+    process = Mock(returncode=returncode, args=['avg_locust_results.py'])
+    process.poll.return_value = returncode
+    process.wait.return_value = returncode
+    return process
+
+def test_run_benchmark_aborts_before_next_locust_run_when_averaging_failed(tmp_path):
+    benchmark = EchoSwift(str(tmp_path), "http://localhost:8000/v1/completions", "vLLM",
+                          user_counts=[1, 2], output_tokens=[256, 512])
+    runs = []
+
+    with patch.object(EchoSwift, '_run_locust', side_effect=lambda u, i, o, *args: runs.append((u, o))), \
+         patch.object(EchoSwift, '_calculate_average', return_value=make_process(1)):
+        with pytest.raises(subprocess.CalledProcessError):
+            benchmark.run_benchmark()
+
+    assert runs == [(1, 256), (1, 512)]
+
+def run_with_total_throughputs(tmp_path, total_throughputs, plateau_threshold):
+    # Fakes a sweep where each user count reaches the given total throughput
+    benchmark = EchoSwift(str(tmp_path), "http://localhost:8000/v1/completions", "vLLM",
+                          user_counts=list(total_throughputs), plateau_threshold=plateau_threshold)
+    runs = []
+
+    def calculate_average(user_dir, input_token):
+        users = int(user_dir.name.split('_')[0])
+        (user_dir / f"avg_{input_token}_input_tokens.csv").write_text(
+            f"output tokens,throughput(tokens/second)\n256,{total_throughputs[users] / users}\n")
+        return make_process(0)
+
+    with patch.object(EchoSwift, '_run_locust', side_effect=lambda u, *args: runs.append(u)), \
+         patch.object(EchoSwift, '_calculate_average', side_effect=calculate_average):
+        benchmark.run_benchmark()
+
+    return runs
+
+def test_run_benchmark_stops_after_two_consecutive_plateau_steps(tmp_path):
+    # 1->2 and 3->4 are single sub-threshold gains, 4->5 is the second in a row
+    runs = run_with_total_throughputs(tmp_path, {1: 100, 2: 101, 3: 200, 4: 201, 5: 202, 6: 300}, 0.02)
+    assert runs == [1, 2, 3, 4, 5]
+
+def test_run_benchmark_does_not_stop_on_a_single_plateau_step(tmp_path):
+    runs = run_with_total_throughputs(tmp_path, {1: 100, 2: 101, 3: 200, 4: 201}, 0.02)
+    assert runs == [1, 2, 3, 4]
+
+def test_run_benchmark_ignores_zero_throughput_when_checking_plateau(tmp_path):
+    runs = run_with_total_throughputs(tmp_path, {1: 0, 2: 0, 3: 0, 4: 0}, 0.02)
+    assert runs == [1, 2, 3, 4]
+
+def test_run_benchmark_without_plateau_threshold_runs_every_user_count(tmp_path):
+    runs = run_with_total_throughputs(tmp_path, {1: 100, 2: 100, 3: 100, 4: 100}, None)
+    assert runs == [1, 2, 3, 4]
+
+def test_run_benchmark_uses_a_single_backend_instead_of_base_url(tmp_path):
+    benchmark = EchoSwift(str(tmp_path), "http://base:8000/v1/completions", "vLLM",
+                          user_counts=[1, 2], backends=["http://only:8000/v1/completions"])
+    urls = []
+
+    with patch.object(EchoSwift, '_run_locust', side_effect=lambda *args: urls.append(args[5])), \
+         patch.object(EchoSwift, '_calculate_average', return_value=make_process(0)):
+        benchmark.run_benchmark()
+
+    assert urls == ["http://only:8000/v1/completions"] * 2
+
+def test_run_benchmark_spreads_user_counts_across_backends(tmp_path):
+    backends = ["http://host-a:8000/v1/completions", "http://host-b:8000/v1/completions"]
+    benchmark = EchoSwift(str(tmp_path), "http://base:8000/v1/completions", "vLLM",
+                          user_counts=[1, 2, 3, 4, 5, 6], backends=backends)
+    ran_on = {}
+    in_use = set()
+    shared_backend = []
+    lock = threading.Lock()
+
+    def run_locust(u, input_tokens, output_tokens, output_file, logs_dir, api_url, progress_position):
+        with lock:
+            if api_url in in_use:
+                shared_backend.append(api_url)
+            in_use.add(api_url)
+            ran_on[u] = api_url
+        time.sleep(0.05)
+        with lock:
+            in_use.discard(api_url)
+
+    with patch.object(EchoSwift, '_run_locust', side_effect=run_locust), \
+         patch.object(EchoSwift, '_calculate_average', return_value=make_process(0)):
+        benchmark.run_benchmark()
+
+    assert sorted(ran_on) == [1, 2, 3, 4, 5, 6]
+    assert set(ran_on.values()) <= set(backends)
+    assert shared_backend == []
+
+def test_run_benchmark_cancels_queued_user_counts_when_one_fails(tmp_path):
+    backends = ["http://host-a:8000/v1/completions", "http://host-b:8000/v1/completions"]
+    benchmark = EchoSwift(str(tmp_path), "http://base:8000/v1/completions", "vLLM",
+                          user_counts=list(range(1, 11)), backends=backends)
+    ran_on = {}
+    release = threading.Event()
+
+    def run_locust(u, input_tokens, output_tokens, output_file, logs_dir, api_url, progress_position):
+        ran_on[u] = api_url
+        if u != 1:
+            release.wait(timeout=5)
+
+    def calculate_average(user_dir, input_token):
+        return make_process(1 if user_dir.name == "1_User" else 0)
+
+    timer = threading.Timer(0.5, release.set)
+    timer.start()
+    try:
+        with patch.object(EchoSwift, '_run_locust', side_effect=run_locust), \
+             patch.object(EchoSwift, '_calculate_average', side_effect=calculate_average):
+            with pytest.raises(subprocess.CalledProcessError):
+                benchmark.run_benchmark()
+    finally:
+        timer.cancel()
+        release.set()
+
+    # Only user counts already picked up by a worker may have run. If the failed
+    # worker took another one, it can only have used the backend it just returned.
+    assert set(ran_on) <= {1, 2, 3}
+    if 3 in ran_on:
+        assert ran_on[3] == ran_on[1]